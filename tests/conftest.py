@@ -0,0 +1,45 @@
+# coding: utf-8
+
+from urllib.parse import urlparse
+
+import pytest
+
+import wda
+from wda.utils import AttrDict
+
+
+class FakeWDA:
+    """
+    Replace wda.httpdo, record requests and reply from routes
+
+    routes: (method, path) -> value, exception or callable(data) returns value
+    """
+    def __init__(self):
+        self.requests = []
+        self.routes = {}
+
+    def __call__(self, url, method="GET", data=None, timeout=None, session=None):
+        method = method.upper()
+        path = urlparse(url).path
+        self.requests.append((method, path, data))
+        ret = self.routes.get((method, path))
+        if callable(ret):
+            ret = ret(data)
+        if isinstance(ret, Exception):
+            raise ret
+        return AttrDict({"value": ret, "sessionId": "SID", "status": 0})
+
+    def paths(self):
+        return [path for _, path, _ in self.requests]
+
+
+@pytest.fixture
+def fake_wda(monkeypatch):
+    fake = FakeWDA()
+    monkeypatch.setattr(wda, "httpdo", fake)
+    return fake
+
+
+@pytest.fixture
+def client(fake_wda):
+    return wda.Client("http://localhost:8100", _session_id="SID")
@@ -0,0 +1,258 @@
+# coding: utf-8
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+import wda
+from wda.exceptions import WDAInvalidSessionIdError, WDARequestError
+
+
+def _no_such_alert():
+    return WDARequestError(110, {"error": "no such alert", "message": "An attempt was made to operate on a modal dialog when one was not open"})
+
+
+@pytest.fixture
+def alert_buttons(fake_wda):
+    """ buttons of the alert shown on fake device, None means no alert """
+    state = {"buttons": None}
+
+    def _buttons(data):
+        if state["buttons"] is None:
+            return _no_such_alert()
+        return state["buttons"]
+
+    def _accept(data):
+        if state["buttons"] is None:
+            return _no_such_alert()
+        if data["name"] not in state["buttons"]:
+            return WDARequestError(110, {"error": "invalid element state", "message": "Failed to find button"})
+        state["buttons"] = None
+
+    fake_wda.routes[("GET", "/session/SID/wda/alert/buttons")] = _buttons
+    fake_wda.routes[("POST", "/session/SID/alert/accept")] = _accept
+    return state
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """ fake time.monotonic, advanced by the test """
+    now = [1000.0]
+    monkeypatch.setattr(wda.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestAlertExists:
+    """Test cases for the negative cache of Alert.exists"""
+
+    def test_exists_no_alert_cached(self, client, fake_wda, alert_buttons, clock):
+        """Test that no alert is reused within NO_ALERT_CACHE_TTL and a found alert is not cached"""
+        alert = client.alert
+        assert not alert.exists
+        alert_buttons["buttons"] = ["OK"]
+        assert not alert.exists
+        assert len(fake_wda.requests) == 1
+
+        clock[0] += wda.Alert.NO_ALERT_CACHE_TTL
+        assert alert.exists
+        assert alert.exists
+        assert len(fake_wda.requests) == 3
+
+    def test_invalidate_cache(self, client, fake_wda, alert_buttons, clock):
+        """Test that invalidate_cache makes next exists request WDA"""
+        alert = client.alert
+        assert not alert.exists
+        alert_buttons["buttons"] = ["OK"]
+        alert.invalidate_cache()
+        assert alert.exists
+        assert len(fake_wda.requests) == 2
+
+
+class TestAlertWait:
+    """Test cases for Alert.wait"""
+
+    @pytest.fixture
+    def sleeps(self, clock, monkeypatch):
+        """ time.sleep advances the fake clock """
+        delays = []
+
+        def _sleep(seconds):
+            delays.append(seconds)
+            clock[0] += seconds
+
+        monkeypatch.setattr(wda.time, "sleep", _sleep)
+        return delays
+
+    def test_wait_returns_buttons(self, client, fake_wda, alert_buttons, sleeps):
+        """Test that wait returns the buttons of the alert once it appears"""
+        def _buttons(data):
+            if len(fake_wda.requests) < 3:
+                return _no_such_alert()
+            return ["Allow", "Don't Allow"]
+
+        fake_wda.routes[("GET", "/session/SID/wda/alert/buttons")] = _buttons
+        assert client.alert.wait(5) == ["Allow", "Don't Allow"]
+        assert len(fake_wda.requests) == 3
+        assert sleeps == sorted(sleeps)
+
+    def test_wait_timeout(self, client, fake_wda, alert_buttons, sleeps):
+        """Test that wait returns None when no alert appears before timeout"""
+        assert client.alert.wait(1) is None
+        assert sum(sleeps) >= 1
+        assert max(sleeps) <= 0.2
+
+
+class TestAlertClick:
+    """Test cases for Alert.click and Alert.click_exists"""
+
+    def test_click_exists_no_alert(self, client, fake_wda, alert_buttons):
+        """Test that no alert stops after the first request"""
+        assert client.alert.click_exists(wda.Alert.DEFAULT_ACCEPT_BUTTONS) is None
+        assert len(fake_wda.requests) == 1
+
+    def test_click_no_alert_raises(self, client, alert_buttons):
+        """Test that click raises the no such alert error"""
+        with pytest.raises(WDARequestError):
+            client.alert.click(["Allow", "OK"])
+
+    def test_click_exists_first_match(self, client, fake_wda, alert_buttons):
+        """Test that a present first button is clicked with one request"""
+        alert_buttons["buttons"] = ["Allow", "Don't Allow"]
+        assert client.alert.click_exists(["Allow", "OK"]) == "Allow"
+        assert fake_wda.requests == [("POST", "/session/SID/alert/accept", {"name": "Allow"})]
+
+    def test_click_exists_later_match(self, client, fake_wda, alert_buttons):
+        """Test that missing buttons are skipped until one matches"""
+        alert_buttons["buttons"] = ["好"]
+        assert client.alert.click_exists(["Allow", "好"]) == "好"
+        assert [d["name"] for _, _, d in fake_wda.requests] == ["Allow", "好"]
+
+    def test_click_no_match(self, client, fake_wda, alert_buttons):
+        """Test that ValueError lists the available buttons"""
+        alert_buttons["buttons"] = ["好"]
+        with pytest.raises(ValueError) as excinfo:
+            client.alert.click(["Allow", "OK"])
+        assert excinfo.value.args[1] == ["好"]
+        assert len(fake_wda.requests) == 3
+
+    def test_click_prefetch(self, client, fake_wda, alert_buttons):
+        """Test that prefetch gets buttons and posts only the matched one"""
+        alert_buttons["buttons"] = ["好"]
+        assert client.alert.click(["Allow", "好"], prefetch=True) == "好"
+        assert fake_wda.paths() == ["/session/SID/wda/alert/buttons", "/session/SID/alert/accept"]
+
+    def test_click_exists_invalid_session(self, client, fake_wda, alert_buttons):
+        """Test that errors other than a missing button are not retried with next name"""
+        fake_wda.routes[("POST", "/session/SID/alert/accept")] = WDAInvalidSessionIdError(
+            110, {"error": "invalid session id", "message": "Session does not exist"})
+        assert client.alert.click_exists(wda.Alert.DEFAULT_ACCEPT_BUTTONS) is None
+        assert len(fake_wda.requests) == 1
+
+
+class _FakeAlert(wda.Alert):
+    """ alert with stubbed _probe and click_exists, buttons None means no alert """
+    def __init__(self, client, buttons=None, error=None, click_ok=True):
+        super().__init__(client)
+        self.buttons = buttons
+        self.error = error
+        self.click_ok = click_ok
+        self.probes = 0
+        self.clicks = []
+
+    def _probe(self):
+        self.probes += 1
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return self.buttons
+
+    def click_exists(self, buttons):
+        self.clicks.append(buttons)
+        return buttons if self.click_ok else None
+
+
+def _wait_until(cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(.01)
+
+
+@pytest.fixture
+def watcher_pool(monkeypatch):
+    pool = wda._WatcherPool()
+    monkeypatch.setattr(wda, "_alert_watcher_pool", pool)
+    return pool
+
+
+@pytest.fixture
+def thread_starts(monkeypatch):
+    """ mock of threading.Thread, started threads still run """
+    mock = Mock(side_effect=threading.Thread)
+    monkeypatch.setattr(wda.threading, "Thread", mock)
+    return mock
+
+
+class TestWatchAndClick:
+    """Test cases for Alert.watch_and_click and its thread pool"""
+
+    @pytest.mark.parametrize("debounce, once", [(10, True), (0, False)])
+    def test_debounce(self, client, debounce, once):
+        """Test that the same button is not clicked again within debounce seconds"""
+        alert = _FakeAlert(client, buttons=["OK"])
+        with alert.watch_and_click(["OK"], interval=.01, debounce=debounce):
+            _wait_until(lambda: alert.probes >= 5)
+        assert (alert.clicks == ["OK"]) is once
+
+    def test_debounce_failed_click(self, client):
+        """Test that a failed click is retried on next tick"""
+        alert = _FakeAlert(client, buttons=["OK"], click_ok=False)
+        with alert.watch_and_click(["OK"], interval=.01, debounce=10):
+            _wait_until(lambda: len(alert.clicks) >= 3)
+
+    def test_click_priority(self, client):
+        """Test that the first watched name is clicked, not the first button WDA reports"""
+        alert = _FakeAlert(client, buttons=["Don't Allow", "OK", "Allow"])
+        with alert.watch_and_click(["Allow", "OK", "Allow"], interval=.01):
+            _wait_until(lambda: alert.clicks)
+        assert alert.clicks[0] == "Allow"
+
+    def test_nested_watchers_run_concurrently(self, client, watcher_pool):
+        """Test that a nested watcher does not wait for the outer one"""
+        outer, inner = _FakeAlert(client), _FakeAlert(client)
+        with outer.watch_and_click(interval=.01):
+            _wait_until(lambda: outer.probes > 0)
+            with inner.watch_and_click(interval=.01):
+                _wait_until(lambda: inner.probes > 0)
+                n = outer.probes
+                _wait_until(lambda: outer.probes > n)
+
+    def test_idle_thread_reused(self, client, watcher_pool, thread_starts):
+        """Test that a later watcher runs on the thread of a stopped one"""
+        first = _FakeAlert(client)
+        with first.watch_and_click(interval=.01):
+            _wait_until(lambda: first.probes > 0)
+        _wait_until(lambda: watcher_pool._idle == 1)
+        assert thread_starts.call_count == 1
+
+        second = _FakeAlert(client)
+        with second.watch_and_click(interval=.01):
+            _wait_until(lambda: second.probes > 0)
+        assert thread_starts.call_count == 1
+
+    def test_error_logged_and_worker_reused(self, client, watcher_pool, thread_starts, monkeypatch):
+        """Test that an error of the watcher is logged and its thread keeps serving"""
+        logger = Mock()
+        monkeypatch.setattr(wda, "logger", logger)
+        broken = _FakeAlert(client, error=RuntimeError("boom"))
+        with broken.watch_and_click(interval=.01):
+            _wait_until(lambda: watcher_pool._idle == 1)
+        logger.exception.assert_called_once_with("alert watcher error")
+
+        alert = _FakeAlert(client, buttons=["OK"])
+        with alert.watch_and_click(interval=.01):
+            _wait_until(lambda: alert.clicks)
+        assert alert.clicks[0] == "OK"
+        assert thread_starts.call_count == 1
@@ -0,0 +1,175 @@
+# coding: utf-8
+
+import base64
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+import wda
+from wda.usbmux import HTTPResponseWrapper
+from wda.usbmux.exceptions import HTTPError
+
+
+class TestWindowSize:
+    """Test cases for the cached window_size"""
+
+    @pytest.fixture
+    def window(self, fake_wda):
+        fake_wda.routes[("GET", "/session/SID/window/size")] = {"width": 375, "height": 667}
+        fake_wda.routes[("GET", "/wda/locked")] = False
+
+    def _rotate(self, fake_wda):
+        fake_wda.routes[("GET", "/session/SID/window/size")] = {"width": 667, "height": 375}
+
+    def test_window_size_cached(self, client, fake_wda, window):
+        """Test that window size is fetched once"""
+        assert client.window_size() == (375, 667)
+        assert client.window_size() == (375, 667)
+        assert fake_wda.paths().count("/session/SID/window/size") == 1
+
+    @pytest.mark.parametrize("action", [
+        lambda c: c.home(),
+        lambda c: c.session("com.game.landscape"),
+        lambda c: c.app_launch("com.apple.Preferences"),
+        lambda c: c.app_start("com.apple.Preferences"),
+        lambda c: c.app_activate("com.apple.Preferences"),
+        lambda c: c.app_terminate("com.apple.Preferences"),
+        lambda c: c.app_stop("com.apple.Preferences"),
+        lambda c: c.deactivate(1),
+        lambda c: setattr(c, "orientation", "LANDSCAPE"),
+    ], ids=["home", "session", "app_launch", "app_start", "app_activate", "app_terminate", "app_stop", "deactivate", "orientation"])
+    def test_window_size_invalidated(self, client, fake_wda, window, action):
+        """Test that changing orientation or foreground app drops the cached window size"""
+        client.window_size()
+        action(client)
+        self._rotate(fake_wda)
+        assert client.window_size() == (667, 375)
+        assert fake_wda.paths().count("/session/SID/window/size") == 2
+
+    def test_window_size_shared_with_session(self, client, fake_wda, window):
+        """Test that a session() client shares the cache with the client created it"""
+        client.window_size()
+        app = client.session("com.game.landscape")
+        self._rotate(fake_wda)
+        assert app.window_size() == (667, 375)
+        assert client.window_size() == (667, 375)
+
+        app.orientation = "PORTRAIT"
+        fake_wda.routes[("GET", "/session/SID/window/size")] = {"width": 375, "height": 667}
+        assert client.window_size() == (375, 667)
+        assert fake_wda.paths().count("/session/SID/window/size") == 3
+
+
+def _unknown_command():
+    return wda.WDARequestError(110, {"error": "unknown command", "message": "Unhandled endpoint: /wda/tap"})
+
+
+class TestTap:
+    """Test cases for the detected tap endpoint"""
+
+    def test_tap_new_wda(self, client, fake_wda):
+        """Test that /wda/tap is used without fallback on new WDA"""
+        client.tap(1, 2)
+        client.tap(3, 4)
+        assert fake_wda.requests == [
+            ("POST", "/session/SID/wda/tap", {"x": 1, "y": 2}),
+            ("POST", "/session/SID/wda/tap", {"x": 3, "y": 4}),
+        ]
+
+    def test_tap_old_wda(self, client, fake_wda):
+        """Test that old WDA falls back to /wda/tap/0 once, then keeps using it"""
+        fake_wda.routes[("POST", "/session/SID/wda/tap")] = _unknown_command()
+        for _ in range(3):
+            client.tap(1, 2)
+        assert fake_wda.paths() == ["/session/SID/wda/tap"] + ["/session/SID/wda/tap/0"] * 3
+
+    def test_tap_path_not_cached_on_error(self, client, fake_wda):
+        """Test that tap path is detected again when both endpoints failed"""
+        fake_wda.routes[("POST", "/session/SID/wda/tap")] = _unknown_command()
+        fake_wda.routes[("POST", "/session/SID/wda/tap/0")] = _unknown_command()
+        with pytest.raises(wda.WDARequestError):
+            client.tap(1, 2)
+        del fake_wda.routes[("POST", "/session/SID/wda/tap")]
+        client.tap(1, 2)
+        assert fake_wda.paths() == ["/session/SID/wda/tap", "/session/SID/wda/tap/0", "/session/SID/wda/tap"]
+
+    def test_tap_path_inherited_by_session(self, client, fake_wda):
+        """Test that clients created by session() reuse the detected tap path"""
+        fake_wda.routes[("POST", "/session/SID/wda/tap")] = _unknown_command()
+        fake_wda.routes[("GET", "/wda/locked")] = False
+        client.tap(1, 2)
+        app = client.session("com.apple.Preferences")
+        fake_wda.requests.clear()
+        app.tap(3, 4)
+        assert fake_wda.paths() == ["/session/SID/wda/tap/0"]
+
+
+class TestClipboard:
+    """Test cases for set_clipboard and get_clipboard"""
+
+    @pytest.mark.parametrize("content", ["你好", "你好".encode("utf-8"), b"\x89PNG\xff"])
+    def test_set_clipboard(self, client, fake_wda, content):
+        """Test that str and bytes are both sent base64 encoded"""
+        client.set_clipboard(content)
+        _, path, data = fake_wda.requests[0]
+        assert path == "/session/SID/wda/setPasteboard"
+        expect = content.encode("utf-8") if isinstance(content, str) else content
+        assert base64.b64decode(data["content"]) == expect
+
+    def test_get_clipboard(self, client, fake_wda, monkeypatch):
+        """Test that clipboard is decoded as utf-8 unless decode is False"""
+        monkeypatch.setattr(wda.time, "sleep", lambda _: None)
+        fake_wda.routes[("GET", "/wda/activeAppInfo")] = {"bundleId": "com.apple.Preferences"}
+        fake_wda.routes[("GET", "/wda/locked")] = False
+        fake_wda.routes[("POST", "/session/SID/wda/getPasteboard")] = base64.b64encode("你好".encode("utf-8")).decode()
+        assert client.get_clipboard() == "你好"
+        fake_wda.routes[("POST", "/session/SID/wda/getPasteboard")] = base64.b64encode(b"\x89PNG\xff").decode()
+        assert client.get_clipboard(decode=False) == b"\x89PNG\xff"
+
+
+class TestIsReady:
+    """Test cases for the raw /status liveness check"""
+
+    @pytest.mark.parametrize("status_code, content, ready", [
+        (200, b'{"value": {"state": "success", "ready": true}, "sessionId": null}', True),
+        (200, b'<html>proxy</html>', False),
+        (502, b'{"value": {"state": "error"}}', False),
+    ])
+    def test_is_ready(self, client, monkeypatch, status_code, content, ready):
+        """Test that only a WDA status response is ready"""
+        session = client._BaseClient__http_session
+        monkeypatch.setattr(session, "fetch", lambda url, timeout=None: HTTPResponseWrapper(content, status_code))
+        assert client.is_ready() is ready
+
+    def test_is_ready_error(self, client, monkeypatch):
+        """Test that connection errors are not ready"""
+        session = client._BaseClient__http_session
+        monkeypatch.setattr(session, "fetch", Mock(side_effect=HTTPError("connection refused")))
+        assert client.is_ready() is False
+
+
+class TestCloseConnections:
+    """Test cases for closing the shared HTTPSession"""
+
+    def test_close_connections_wait_request(self, client, monkeypatch):
+        """Test that connections are not closed while a request to the same host is running"""
+        closed = threading.Event()
+        session = client._BaseClient__http_session
+        monkeypatch.setattr(session, "close", closed.set)
+
+        with wda.namedlock("http://localhost:8100"):
+            th = threading.Thread(target=client.close_connections, daemon=True)
+            th.start()
+            assert not closed.wait(.2)
+        th.join(3)
+        assert closed.is_set()
+
+    def test_close_owner_session(self, client, fake_wda, monkeypatch):
+        """Test that close takes the host lock before closing its own connections"""
+        held = []
+        session = client._BaseClient__http_session
+        monkeypatch.setattr(session, "close", lambda: held.append(wda.namedlock("http://localhost:8100").locked()))
+        client.close()
+        assert held == [True]
+        assert ("DELETE", "/session/SID/", None) in fake_wda.requests
@@ -0,0 +1,30 @@
+# coding: utf-8
+
+import pytest
+
+from wda import _error_class
+from wda.exceptions import (WDAInvalidSessionIdError, WDAKeyboardNotPresentError,
+                            WDAPossiblyCrashedError, WDARequestError,
+                            WDAStaleElementReferenceError, WDAUnknownError)
+
+
+@pytest.mark.parametrize("value, expect", [
+    ({"error": "invalid session id", "message": "possibly crashed"}, WDAInvalidSessionIdError),
+    ({"error": "unknown error", "message": "Application possibly crashed"}, WDAPossiblyCrashedError),
+    ({"error": "invalid element state", "message": "The on-screen keyboard must be present to send keys"}, WDAKeyboardNotPresentError),
+    ({"error": "invalid element state", "message": "element is not enabled"}, WDARequestError),
+    ({"error": "unknown error", "message": ""}, WDAUnknownError),
+    ({"error": "stale element reference"}, WDAStaleElementReferenceError),
+    ({"error": "no such alert"}, WDARequestError),
+])
+def test_error_class(value, expect):
+    """Test that WDA error responses map to the same classes as the check() methods"""
+    assert _error_class(value) is expect
+
+
+def test_request_error_message():
+    """Test that WDARequestError keeps the message of WDA response"""
+    e = WDARequestError(110, {"error": "unknown error", "message": "Timeout waiting until SpringBoard is visible"})
+    assert e.message == "Timeout waiting until SpringBoard is visible"
+    assert WDARequestError(-1, "screenshot png format error").message == "screenshot png format error"
+    assert WDARequestError(110, {"error": "no such alert"}).message == ""
@@ -0,0 +1,149 @@
+# coding: utf-8
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from unittest.mock import Mock
+
+import pytest
+
+import wda.usbmux
+from wda.usbmux import HTTPSession, fetch, http_create
+from wda.usbmux.exceptions import HTTPError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply()
+
+    def _reply(self):
+        self.server.ports.add(self.client_address[1])
+        self.server.requests.append((self.command, self.path))
+        if self.path == "/drop":  # request handled, connection lost before response
+            self.close_connection = True
+            return
+        body = json.dumps({"value": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path == "/close":  # idle connection closed without telling the client
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.ports = set()
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path):
+    return "http://127.0.0.1:%d%s" % (server.server_address[1], path)
+
+
+class TestHTTPSession:
+    """Test cases for the HTTPSession class"""
+
+    def test_fetch_reuse_connection(self, server):
+        """Test that requests to the same host share one connection"""
+        session = HTTPSession()
+        for path in ("/status", "/source", "/screenshot"):
+            resp = session.fetch(_url(server, path), timeout=3)
+            assert resp.status_code == 200
+            assert resp.json() == {"value": path}
+        assert len(server.ports) == 1
+        session.close()
+
+    def test_fetch_reconnect_after_close(self, server):
+        """Test that a closed session reconnects on next request"""
+        session = HTTPSession()
+        session.fetch(_url(server, "/status"), timeout=3)
+        session.close()
+        resp = session.fetch(_url(server, "/status"), timeout=3)
+        assert resp.json() == {"value": "/status"}
+        assert len(server.ports) == 2
+        session.close()
+
+    def test_fetch_without_keepalive(self, server):
+        """Test that keepalive=False opens a connection per request"""
+        session = HTTPSession(keepalive=False)
+        for _ in range(2):
+            assert session.fetch(_url(server, "/status"), timeout=3).status_code == 200
+        assert len(server.ports) == 2
+
+    def test_fetch_connection_refused(self, server):
+        """Test that connection errors are raised as HTTPError"""
+        session = HTTPSession()
+        with pytest.raises(HTTPError):
+            session.fetch("http://127.0.0.1:1/status", timeout=3)
+
+    def test_fetch_replace_failed_connection(self, server, monkeypatch):
+        """Test that a failed connection is dropped and created again on next request"""
+        created = []
+
+        def _http_create(url):
+            created.append(url)
+            return http_create(url)
+
+        monkeypatch.setattr(wda.usbmux, "http_create", _http_create)
+        session = HTTPSession()
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                session.fetch("http://127.0.0.1:1/status", timeout=3)
+            assert session._conns == {}
+        assert len(created) == 2
+
+        session.fetch(_url(server, "/status"), timeout=3)
+        key = "http://127.0.0.1:%d" % server.server_address[1]
+        conn = session._conns[key]
+        monkeypatch.setattr(wda.usbmux, "_request", Mock(side_effect=OSError("device gone")))
+        with pytest.raises(HTTPError):
+            session.fetch(_url(server, "/status"), timeout=3)
+        assert key not in session._conns
+        assert conn.sock is None
+        monkeypatch.undo()
+        assert session.fetch(_url(server, "/status"), timeout=3).status_code == 200
+        assert session._conns[key] is not conn
+        session.close()
+
+    def test_fetch_dropped_idle_connection(self, server):
+        """Test that an idle connection closed by server is replaced before sending"""
+        session = HTTPSession()
+        session.fetch(_url(server, "/close"), timeout=3)
+        resp = session.fetch(_url(server, "/wda/tap"), "POST", {"x": 1, "y": 2}, timeout=3)
+        assert resp.json() == {"value": "/wda/tap"}
+        assert server.requests == [("GET", "/close"), ("POST", "/wda/tap")]
+        assert len(server.ports) == 2
+        session.close()
+
+    @pytest.mark.parametrize("method, sent", [("POST", 1), ("GET", 2)])
+    def test_fetch_lost_response(self, server, method, sent):
+        """Test that only requests safe to repeat are sent again when response is lost"""
+        session = HTTPSession()
+        session.fetch(_url(server, "/status"), timeout=3)
+        with pytest.raises(HTTPError):
+            session.fetch(_url(server, "/drop"), method, timeout=3)
+        assert server.requests.count((method, "/drop")) == sent
+
+
+def test_fetch_new_connection(server):
+    """Test that module level fetch opens a connection per request"""
+    for _ in range(2):
+        assert fetch(_url(server, "/status"), timeout=3).json() == {"value": "/status"}
+    assert len(server.ports) == 2
@@ -11,13 +11,14 @@ import io
 import json
 import logging
 import os
+import queue
 import re
 import shutil
 import subprocess
 import threading
 import time
-from collections import defaultdict, namedtuple
-from typing import Callable, Optional, Union, Dict, NamedTuple
+from collections import defaultdict
+from typing import Callable, Optional, Union, Dict, NamedTuple, Tuple
 from urllib.parse import urlparse
 
 import retry
@@ -27,7 +28,7 @@ from deprecated import deprecated
 from wda import xcui_element_types
 from wda._proto import *
 from wda.exceptions import *
-from wda.usbmux import fetch
+from wda.usbmux import HTTPSession, fetch
 from wda.usbmux.pyusbmux import list_devices, select_device
 from wda.utils import inject_call, limit_call_depth, AttrDict, convert
 
@@ -58,6 +59,10 @@ PORTRAIT = 'PORTRAIT'
 LANDSCAPE_RIGHT = 'UIA_DEVICE_ORIENTATION_LANDSCAPERIGHT'
 PORTRAIT_UPSIDEDOWN = 'UIA_DEVICE_ORIENTATION_PORTRAIT_UPSIDEDOWN'
 
+_PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+_pil_image_open = None  # PIL.Image.open, imported on first pillow screenshot
+_XCUI_TYPE_RE = re.compile(r'/(' + '|'.join(xcui_element_types.ELEMENTS) + ')')
+
 class HTTPRequest(NamedTuple):
     fetch: Callable[..., AttrDict]
     get: Callable[[str, Optional[Dict], Optional[float]], AttrDict]
@@ -69,6 +74,14 @@ class HTTPSessionRequest(NamedTuple):
     post: Callable[[str, Optional[Dict], Optional[float]], AttrDict]
     delete: Callable[[str, Optional[Dict], Optional[float]], AttrDict]
 
+class Size(NamedTuple):
+    width: int
+    height: int
+
+class Point(NamedTuple):
+    x: int
+    y: int
+
 class Status(enum.IntEnum):
     # 不是怎么准确，status在mds平台上变来变去的
     UNKNOWN = 100  # other status
@@ -114,19 +127,41 @@ def namedlock(name):
     return namedlock.locks[name]
 
 
-def httpdo(url, method="GET", data=None, timeout=None) -> AttrDict:
+# WDA response "error" field to exception class
+_ERROR_DISPATCH = {
+    errCls.ERROR_KEY: errCls
+    for errCls in (WDAInvalidSessionIdError, WDAKeyboardNotPresentError, WDAUnknownError, WDAStaleElementReferenceError)
+}
+
+
+def _error_class(value: dict) -> type:
+    errCls = _ERROR_DISPATCH.get(value.get("error"))
+    if errCls is WDAInvalidSessionIdError:
+        return errCls
+    # "possibly crashed" is only found in message, whatever the error is
+    if WDAPossiblyCrashedError.check(value):
+        return WDAPossiblyCrashedError
+    if errCls is not None and errCls.check(value):
+        return errCls
+    return WDARequestError
+
+
+def httpdo(url, method="GET", data=None, timeout=None, session: Optional[HTTPSession] = None) -> AttrDict:
     """
     thread safe http request
 
+    Args:
+        session: reuse keep-alive connections if set
+
     Raises:
         WDAError, WDARequestError, WDAEmptyResponseError
     """
     p = urlparse(url)
     with namedlock(p.scheme + "://" + p.netloc):
-        return _unsafe_httpdo(url, method, data, timeout)
+        return _unsafe_httpdo(url, method, data, timeout, session)
 
 
-def _unsafe_httpdo(url: str, method='GET', data=None, timeout=None):
+def _unsafe_httpdo(url: str, method='GET', data=None, timeout=None, session: Optional[HTTPSession] = None):
     """
     Do HTTP Request
     """
@@ -138,7 +173,10 @@ def _unsafe_httpdo(url: str, method='GET', data=None, timeout=None):
 
     if timeout is None:
         timeout = HTTP_TIMEOUT
-    response = fetch(url, method, data, timeout)
+    if session:
+        response = session.fetch(url, method, data, timeout)
+    else:
+        response = fetch(url, method, data, timeout)
     if response.status_code == 502:  # Bad Gateway
         raise WDABadGateway(response.status_code, response.text)
     if DEBUG:
@@ -157,14 +195,10 @@ def _unsafe_httpdo(url: str, method='GET', data=None, timeout=None):
             status = Status.ERROR
             value = r.value.copy()
             value.pop("traceback", None)
-
-            for errCls in (WDAInvalidSessionIdError, WDAPossiblyCrashedError, WDAKeyboardNotPresentError, WDAUnknownError, WDAStaleElementReferenceError):
-                if errCls.check(value):
-                    raise errCls(status, value)
-            raise WDARequestError(status, value)
+            raise _error_class(value)(status, value)
         return r
     except JSONDecodeError:
-        if response.text == "":
+        if not response.content:
             raise WDAEmptyResponseError(method, url, data)
         raise WDAError(method, url, response.text[:100] + "...") # should not too long
 
@@ -188,12 +222,11 @@ class Rect(list):
 
     @property
     def center(self):
-        return namedtuple('Point', ['x', 'y'])(self.x + self.width // 2,
-                                               self.y + self.height // 2)
+        return Point(self.x + self.width // 2, self.y + self.height // 2)
 
     @property
     def origin(self):
-        return namedtuple('Point', ['x', 'y'])(self.x, self.y)
+        return Point(self.x, self.y)
 
     @property
     def left(self):
@@ -232,10 +265,12 @@ def _start_wda_xctest(udid: str, wda_bundle_id=None) -> bool:
 
 
 class BaseClient(object):
-    def __init__(self, url=None, _session_id=None):
+    def __init__(self, url=None, _session_id=None, _http_session: Optional[HTTPSession] = None, keepalive: bool = True):
         """
         Args:
             target (string): the device url
+            _http_session: keep-alive connections shared with the parent client
+            keepalive (bool): reuse connection between requests, set to False to open one per request
 
         If target is empty, device url will set to env-var "DEVICE_URL" if defined else set to "http://localhost:8100"
         """
@@ -244,13 +279,17 @@ class BaseClient(object):
         assert re.match(r"^(http\+usbmux|https?)://", url), "Invalid URL: %r" % url
 
         # Session variable
-        self.__wda_url = url
+        self.__wda_url = url.rstrip("/")  # urlpath always startswith /, join with plain concat
         self.__session_id = _session_id
         self.__is_app = bool(_session_id)  # set to freeze session_id
         self.__timeout = 30.0
         self.__callbacks = defaultdict(list)
         self.__callback_depth = 0
         self.__callback_running = False
+        self.__http_session = _http_session or HTTPSession(keepalive)
+        self.__http_session_owner = _http_session is None
+        self.__window_size = {}  # shared with session() clients, cleared when orientation or foreground app is changed
+        self.__tap_path = None  # detected on first tap
 
         if not _session_id:
             self._init_callback()
@@ -289,9 +328,12 @@ class BaseClient(object):
             Callback.HTTP_REQUEST_BEFORE, self._callback_json_report)
 
     def is_ready(self) -> bool:
+        """ liveness check on raw /status response, no json parsing and callbacks """
         try:
-            self.http.get("status", timeout=3)
-            return True
+            with self._host_lock():
+                response = self.__http_session.fetch(self.__wda_url + "/status", timeout=3)
+            # a proxy might also answer 200, WDA status always has value.state
+            return response.status_code == 200 and b'"state"' in response.content
         except Exception as e:
             return False
 
@@ -320,7 +362,7 @@ class BaseClient(object):
         _dprint("device still offline")
         return False
 
-    @retry.retry(exceptions=WDAEmptyResponseError, tries=3, delay=2)
+    @retry.retry(exceptions=WDAEmptyResponseError, tries=3, delay=1, backoff=2, jitter=(0, .5), max_delay=4)
     def status(self):
         res = self.http.get('status')
         res["value"]['sessionId'] = res.get("sessionId")
@@ -349,10 +391,14 @@ class BaseClient(object):
         """ 运行回调函数 """
         if not callbacks:
             return
+        # dict.get, do not create empty list in defaultdict for every event
+        fns = callbacks.get(event_name)
+        if not fns:
+            return
 
         self.__callback_running = True
         try:
-            for fn in callbacks[event_name]:
+            for fn in fns:
                 ret = inject_call(fn, **kwargs)
                 if ret in [
                         Callback.RET_RETRY, Callback.RET_ABORT,
@@ -381,7 +427,7 @@ class BaseClient(object):
         if self.__callback_running:
             callbacks = None
 
-        url = urljoin(self.__wda_url, urlpath)
+        url = self.__wda_url + urlpath
 
         run_callback = functools.partial(self._run_callback,
                                          callbacks=callbacks,
@@ -394,10 +440,9 @@ class BaseClient(object):
 
         try:
             if with_session:
-                url = urljoin(self.__wda_url, "session", self.session_id,
-                              urlpath)
+                url = self.__wda_url + "/session/" + self.session_id + urlpath
             run_callback(Callback.HTTP_REQUEST_BEFORE)
-            response = httpdo(url, method, data, timeout)
+            response = httpdo(url, method, data, timeout, self.__http_session)
             run_callback(Callback.HTTP_REQUEST_AFTER, response=response)
             return response
         except Exception as err:
@@ -409,15 +454,15 @@ class BaseClient(object):
             else:
                 raise
 
-    @property
+    @cached_property
     def http(self) -> HTTPRequest:
         return HTTPRequest(
             self._fetch,
             functools.partial(self._fetch, "GET"),
             functools.partial(self._fetch, "POST"))
 
-    @property
-    def _session_http(self) -> HTTPRequest:
+    @cached_property
+    def _session_http(self) -> HTTPSessionRequest:
         return HTTPSessionRequest(
             functools.partial(self._fetch, with_session=True),
             functools.partial(self._fetch, "GET", with_session=True),
@@ -426,10 +471,11 @@ class BaseClient(object):
 
     def home(self):
         """Press home button"""
+        self.__window_size.clear()
         try:
             self.http.post('/wda/homescreen')
         except WDARequestError as e:
-            if "Timeout waiting until SpringBoard is visible" in str(e):
+            if "Timeout waiting until SpringBoard is visible" in e.message:
                 return
             raise
 
@@ -452,7 +498,7 @@ class BaseClient(object):
         """ same as time.sleep """
         time.sleep(secs)
 
-    @retry.retry(WDAUnknownError, tries=3, delay=.5, jitter=.2)
+    @retry.retry(WDAUnknownError, tries=3, delay=.5, backoff=2, jitter=(0, .2), max_delay=2)
     def app_current(self) -> dict:
         """
         Returns:
@@ -488,10 +534,10 @@ class BaseClient(object):
             WDARequestError
         """
         value = self.http.get('screenshot').value
-        raw_value = base64.b64decode(value)
-        png_header = b"\x89PNG\r\n\x1a\n"
-        if not raw_value.startswith(png_header) and png_filename:
+        # 12 base64 chars decode to 9 bytes, enough to check header before decoding the whole image
+        if png_filename and not base64.b64decode(value[:12]).startswith(_PNG_HEADER):
             raise WDARequestError(-1, "screenshot png format error")
+        raw_value = base64.b64decode(value)
 
         if png_filename:
             with open(png_filename, 'wb') as f:
@@ -500,9 +546,11 @@ class BaseClient(object):
         if format == 'raw':
             return raw_value
         elif format == 'pillow':
-            from PIL import Image
-            buff = io.BytesIO(raw_value)
-            im = Image.open(buff)
+            global _pil_image_open
+            if _pil_image_open is None:
+                from PIL import Image
+                _pil_image_open = Image.open
+            im = _pil_image_open(io.BytesIO(raw_value))
             return im.convert("RGB") # convert to RGB to fix save jpeg error
         else:
             raise ValueError("unknown format")
@@ -585,6 +633,7 @@ class BaseClient(object):
         # when device is Locked, it is unable to start app
         if self.locked():
             self.unlock()
+        self.__window_size.clear()
         try:
             res = self.http.post('session', payload)
         except WDAEmptyResponseError:
@@ -594,11 +643,23 @@ class BaseClient(object):
             res = self.session().app_state(bundle_id)
             if res.value != 4:
                 raise
-        client = Client(self.__wda_url, _session_id=res.sessionId)
+        client = Client(self.__wda_url, _session_id=res.sessionId, _http_session=self.__http_session)
         client.__timeout = self.__timeout
+        client.__tap_path = self.__tap_path
         client.__callbacks = self.__callbacks
+        client.__window_size = self.__window_size
         return client
 
+    def _host_lock(self) -> threading.Lock:
+        """ same lock as httpdo, connections of the shared HTTPSession are only touched under it """
+        p = urlparse(self.__wda_url)
+        return namedlock(p.scheme + "://" + p.netloc)
+
+    def close_connections(self):
+        """ close kept alive connections, they are opened again on next request """
+        with self._host_lock():
+            self.__http_session.close()
+
 
     '''
     TODO: Should the ctx of the client be written back after this code is executed,\
@@ -611,6 +672,9 @@ class BaseClient(object):
         except WDARequestError as e:
             if not isinstance(e, (WDAInvalidSessionIdError, WDAPossiblyCrashedError)):
                 raise
+        finally:
+            if self.__http_session_owner:
+                self.close_connections()
 
     #@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@#
     ######  Session methods and properties ######
@@ -706,11 +770,17 @@ class BaseClient(object):
         """
         return self.device_info()
 
-    def set_clipboard(self, content, content_type="plaintext"):
-        """ set clipboard """
+    def set_clipboard(self, content: Union[str, bytes], content_type="plaintext"):
+        """ set clipboard
+
+        Args:
+            content: str is encoded with utf-8, bytes is sent as is
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
         self._session_http.post(
             "/wda/setPasteboard", {
-                "content": base64.b64encode(content.encode()).decode(),
+                "content": base64.b64encode(content).decode("ascii"),
                 "contentType": content_type
             })
 
@@ -727,7 +797,7 @@ class BaseClient(object):
         """
         pass
 
-    def get_clipboard(self, wda_bundle_id="com.facebook.WebDriverAgentRunner.xctrunner"):
+    def get_clipboard(self, wda_bundle_id="com.facebook.WebDriverAgentRunner.xctrunner", decode: bool = True):
         """ Get clipboard text.
 
         If you want to use this function, you have to set wda foreground which would switch the 
@@ -735,6 +805,7 @@ class BaseClient(object):
 
         Args:
             wda_bundle_id: The bundle id of the started wda.
+            decode: return raw bytes if set to False, for non-text content
 
         Returns:
             Clipboard text.
@@ -745,7 +816,8 @@ class BaseClient(object):
         clipboard_text = self._session_http.post("/wda/getPasteboard").value
         # Switch back to the screen before.
         self.app_launch(current_app_bundle_id)
-        return base64.b64decode(clipboard_text).decode('utf-8')
+        content = base64.b64decode(clipboard_text)
+        return content.decode('utf-8') if decode else content
     
     def siri_activate(self, text):
         self._session_http.post("/wda/siri/activate", {"text": text})
@@ -770,6 +842,7 @@ class BaseClient(object):
         if self.locked():
             self.unlock()
 
+        self.__window_size.clear()
         return self._session_http.post(
             "/wda/apps/launch", {
                 "bundleId": bundle_id,
@@ -779,12 +852,14 @@ class BaseClient(object):
             })
 
     def app_activate(self, bundle_id):
+        self.__window_size.clear()
         return self._session_http.post("/wda/apps/launch", {
             "bundleId": bundle_id,
         })
 
     def app_terminate(self, bundle_id):
         # Deprecated, use app_stop instead
+        self.__window_size.clear()
         return self._session_http.post("/wda/apps/terminate", {
             "bundleId": bundle_id,
         })
@@ -847,19 +922,25 @@ class BaseClient(object):
         Args:
             - duration (float): deactivate time, seconds
         """
+        self.__window_size.clear()
         return self._session_http.post('/wda/deactivateApp',
                                        dict(duration=duration))
 
     def tap(self, x, y):
         # Support WDA `BREAKING CHANGES`
         # More see: https://github.com/appium/WebDriverAgent/blob/master/CHANGELOG.md#600-2024-01-31
+        if self.__tap_path:
+            return self._session_http.post(self.__tap_path, dict(x=x, y=y))
         try:
-            return self._session_http.post('/wda/tap', dict(x=x, y=y))
-        except:
-            return self._session_http.post('/wda/tap/0', dict(x=x, y=y))
+            ret = self._session_http.post('/wda/tap', dict(x=x, y=y))
+            self.__tap_path = '/wda/tap'
+        except WDAError:
+            ret = self._session_http.post('/wda/tap/0', dict(x=x, y=y))
+            self.__tap_path = '/wda/tap/0'
+        return ret
 
     def _percent2pos(self, x, y, window_size=None):
-        if any(isinstance(v, float) for v in [x, y]):
+        if isinstance(x, float) or isinstance(y, float):
             w, h = window_size or self.window_size()
             x = int(x * w) if isinstance(x, float) else x
             y = int(y * h) if isinstance(y, float) else y
@@ -970,6 +1051,7 @@ class BaseClient(object):
             - orientation(string): LANDSCAPE | PORTRAIT | UIA_DEVICE_ORIENTATION_LANDSCAPERIGHT |
                     UIA_DEVICE_ORIENTATION_PORTRAIT_UPSIDEDOWN
         """
+        self.__window_size.clear()
         return self._session_http.post('orientation',
                                        data={'orientation': value})
 
@@ -978,10 +1060,20 @@ class BaseClient(object):
         Returns:
             namedtuple: eg
                 Size(width=320, height=568)
+
+        The result is cached until orientation is set or foreground app is changed
+        (session, home, app_launch, app_activate, app_terminate, deactivate) by this
+        client or the clients created by its session()
         """
-        size = self._unsafe_window_size()
-        if min(size) > 0:
-            return size
+        size = self.__window_size.get("size")
+        if size is None:
+            size = self.__window_size["size"] = self._safe_window_size()
+        return size
+
+    def _safe_window_size(self) -> Size:
+        w, h = self._raw_window_size()
+        if w > 0 and h > 0:
+            return Size(w, h)
 
         # get orientation, handle alert
         _ = self.orientation  # after this operation, may safe to get window_size
@@ -989,26 +1081,27 @@ class BaseClient(object):
             self.alert.accept()
             time.sleep(.1)
 
-        size = self._unsafe_window_size()
-        if min(size) > 0:
-            return size
+        w, h = self._raw_window_size()
+        if w > 0 and h > 0:
+            return Size(w, h)
 
         logger.warning("unable to get window_size(), try to to create a new session")
         with self.session("com.apple.Preferences") as app:
-            size = app._unsafe_window_size()
-            assert min(size) > 0, "unable to get window_size"
-            return size
+            w, h = app._raw_window_size()
+            assert w > 0 and h > 0, "unable to get window_size"
+            return Size(w, h)
 
-    def _unsafe_window_size(self):
+    def _unsafe_window_size(self) -> Size:
         """
         returns (width, height) might be (0, 0)
         """
+        return Size(*self._raw_window_size())
+
+    def _raw_window_size(self) -> Tuple[int, int]:
         value = self._session_http.get('/window/size').value
-        w = roundint(value['width'])
-        h = roundint(value['height'])
-        return namedtuple('Size', ['width', 'height'])(w, h)
+        return roundint(value['width']), roundint(value['height'])
 
-    @retry.retry(WDAKeyboardNotPresentError, tries=3, delay=1.0)
+    @retry.retry(WDAKeyboardNotPresentError, tries=3, delay=.5, backoff=2, jitter=(0, .5), max_delay=2)
     def send_keys(self, value):
         """
         send keys, yet I know not, todo function
@@ -1106,24 +1199,74 @@ class BaseClient(object):
                 "@taobao property requires wda_taobao library installed")
 
 
+class _WatcherPool(object):
+    """
+    Reuse daemon threads for Alert.watch_and_click, a new thread is started only when all are busy.
+    concurrent.futures is not used, its threads are joined at exit which hangs on a never stopped watcher
+    """
+    def __init__(self):
+        self._tasks = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+
+    def submit(self, fn: Callable):
+        with self._lock:
+            if self._idle > 0:
+                self._idle -= 1
+            else:
+                threading.Thread(name="alert", target=self._worker, daemon=True).start()
+        self._tasks.put(fn)
+
+    def _worker(self):
+        while True:
+            fn = self._tasks.get()
+            try:
+                fn()
+            except Exception:
+                logger.exception("alert watcher error")
+            with self._lock:
+                self._idle += 1
+
+
+_alert_watcher_pool = _WatcherPool()
+
+
 class Alert(object):
     DEFAULT_ACCEPT_BUTTONS = [
         "使用App时允许", "无线局域网与蜂窝网络", "好", "稍后", "稍后提醒", "确定",
         "允许", "以后", "打开", "录屏", "Allow", "OK", "YES", "Yes", "Later", "Close"
     ]
 
+    NO_ALERT_CACHE_TTL = 0.05  # seconds to reuse a "no alert" result of exists
+
+    __slots__ = ('_c', 'http', '_no_alert_until')
+
     def __init__(self, client: BaseClient):
         self._c = client
-        self.http = client._session_http
+        self.http = client._session_http  # goes through the client HTTPSession, connection is kept alive
+        self._no_alert_until = 0.0
 
-    @property
-    def exists(self):
+    def _probe(self) -> Optional[list]:
+        """ returns alert buttons, or None if there is no alert """
         try:
-            self.text
-            return True
+            return self.buttons()
         except WDARequestError as e:
             # expect e.status != 27 in old version and e.value == 'no such alert' in new version
+            return None
+
+    @property
+    def exists(self):
+        if time.monotonic() < self._no_alert_until:
+            return False
+        if self._probe() is None:
+            self._no_alert_until = time.monotonic() + self.NO_ALERT_CACHE_TTL
             return False
+        self._no_alert_until = 0.0
+        return True
+
+    def invalidate_cache(self):
+        """ make next exists check request WDA """
+        self._no_alert_until = 0.0
 
     @property
     def text(self):
@@ -1139,13 +1282,22 @@ class Alert(object):
         '''
         return self.http.post('/alert/text', data={'value': text})
 
-    def wait(self, timeout=20.0):
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if self.exists:
-                return True
-            time.sleep(0.2)
-        return False
+    def wait(self, timeout=20.0) -> Optional[list]:
+        """ wait alert appear, poll fast at first, then slow down to 0.2s
+
+        Returns:
+            alert buttons same as buttons(), None if timeout
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.02
+        probe = self._probe
+        while time.monotonic() < deadline:
+            buttons = probe()
+            if buttons is not None:
+                return buttons
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.2)
+        return None
 
     def accept(self):
         return self.http.post('/alert/accept')
@@ -1156,10 +1308,12 @@ class Alert(object):
     def buttons(self):
         return self.http.get('/wda/alert/buttons').value
 
-    def click(self, button_name: Optional[Union[str, list]] = None):
+    def click(self, button_name: Optional[Union[str, list]] = None, prefetch: bool = False):
         """
         Args:
             - button_name: the name of the button
+            - prefetch: when button_name is list, get buttons first and only post the matched one,
+                otherwise post names in order until one succeeds
 
         Returns:
             button_name being clicked
@@ -1172,11 +1326,24 @@ class Alert(object):
             self.http.post('/alert/accept', data={"name": button_name})
             return button_name
 
-        avaliable_names = self.buttons()
         buttons: list = button_name
+        if not prefetch:
+            for bname in buttons:
+                try:
+                    self.http.post('/alert/accept', data={"name": bname})
+                    return bname
+                except WDARequestError as e:
+                    # only a missing button tries next name, no alert or dead session fails the same way for all
+                    if not (isinstance(e.value, dict) and e.value.get("error") == "invalid element state"):
+                        raise
+            raise ValueError("Only these buttons can be clicked", self.buttons())
+
+        avaliable_names = self.buttons()
+        avaliable_set = set(avaliable_names)
         for bname in buttons:
-            if bname in avaliable_names:
-                return self.click(bname)
+            if bname in avaliable_set:
+                self.http.post('/alert/accept', data={"name": bname})
+                return bname
         raise ValueError("Only these buttons can be clicked", avaliable_names)
 
     def click_exists(self, buttons: Optional[Union[str, list]] = None):
@@ -1195,40 +1362,50 @@ class Alert(object):
     @contextlib.contextmanager
     def watch_and_click(self,
                         buttons: Optional[list] = None,
-                        interval: float = 2.0):
+                        interval: float = 2.0,
+                        debounce: float = 0.5):
         """ watch and click button
         Args:
             buttons: buttons name which need to click
             interval: check interval
+            debounce: seconds to skip clicking the same button again, alert may not be gone yet
         """
         if not buttons:
             buttons = self.DEFAULT_ACCEPT_BUTTONS
 
         event = threading.Event()
+        rank = {}  # button name -> click priority, first one wins
+        for i, name in enumerate(buttons):
+            rank.setdefault(name, i)
 
         def _inner():
+            probe, click_exists = self._probe, self.click_exists  # looked up once for the thread
+            last_name, last_time = None, 0.0
             while not event.is_set():
-                try:
-                    alert_buttons = self.buttons()
-                    logger.info("Alert detected, buttons: %s", alert_buttons)
-                    for btn_name in buttons:
-                        if btn_name in alert_buttons:
+                alert_buttons = probe()
+                if alert_buttons is not None:
+                    logger.debug("Alert detected, buttons: %s", alert_buttons)
+                    hits = [(rank[b], b) for b in alert_buttons if b in rank]
+                    if hits:
+                        _, btn_name = min(hits)
+                        now = time.monotonic()
+                        if btn_name != last_name or now - last_time >= debounce:
                             logger.info("Alert click: %s", btn_name)
-                            self.click(btn_name)
-                            break
+                            if click_exists(btn_name) is not None:  # retry next tick if click failed
+                                last_name, last_time = btn_name, now
                     else:
                         logger.warning("Alert not handled")
-                except WDARequestError:
-                    pass
-                time.sleep(interval)
+                event.wait(interval)  # returns as soon as event is set
 
-        threading.Thread(name="alert", target=_inner, daemon=True).start()
-        yield None
-        event.set()
+        _alert_watcher_pool.submit(_inner)
+        try:
+            yield None
+        finally:
+            event.set()
 
 
 class Client(BaseClient):
-    @property
+    @cached_property
     def alert(self) -> Alert:
         return Alert(self)
 
@@ -1355,8 +1532,7 @@ class Selector(object):
     def _fix_xcui_type(self, s):
         if s is None:
             return
-        re_element = '|'.join(xcui_element_types.ELEMENTS)
-        return re.sub(r'/(' + re_element + ')', '/XCUIElementType\g<1>', s)
+        return _XCUI_TYPE_RE.sub(r'/XCUIElementType\g<1>', s)
 
     def _add_escape_character_for_quote_prime_character(self, text):
         """
@@ -1424,7 +1600,7 @@ class Selector(object):
             chain = chain + '[%d]' % self._index
         return chain
 
-    @retry.retry(WDAStaleElementReferenceError, tries=3, delay=.5, jitter=.2)
+    @retry.retry(WDAStaleElementReferenceError, tries=3, delay=.5, backoff=2, jitter=(0, .2), max_delay=2)
     def find_element_ids(self):
         elems = []
         if self._id:
@@ -1771,7 +1947,7 @@ class Element(object):
 class USBClient(Client):
     """ connect device through unix:/var/run/usbmuxd """
 
-    def __init__(self, udid: str = "", port: int = 8100, wda_bundle_id=None):
+    def __init__(self, udid: str = "", port: int = 8100, wda_bundle_id=None, keepalive: bool = True):
         if not udid:
             infos = [info for info in list_devices() if info.connection_type == 'USB']
             if len(infos) == 0:
@@ -1780,7 +1956,7 @@ class USBClient(Client):
                 raise RuntimeError("more then one device connected")
             udid = infos[0].serial
 
-        super().__init__(url=f"http+usbmux://{udid}:{port}")
+        super().__init__(url=f"http+usbmux://{udid}:{port}", keepalive=keepalive)
         if self.is_ready():
             return
 
@@ -37,9 +37,12 @@ class WDAElementNotDisappearError(WDAError):
 
 
 class WDARequestError(WDAError):
+    ERROR_KEY = None  # value of "error" in WDA response
+
     def __init__(self, status, value):
         self.status = status
         self.value = value
+        self.message = value.get('message', '') if isinstance(value, dict) else str(value)
 
     def __str__(self):
         return 'WDARequestError(status=%d, value=%s)' % (self.status,
@@ -52,6 +55,7 @@ class WDAKeyboardNotPresentError(WDARequestError):
     #     "The on-screen keyboard must be present to send keys" 
     #     UserInfo={NSLocalizedDescription=The on-screen keyboard must be present to send keys}',
     #  'traceback': ''})
+    ERROR_KEY = 'invalid element state'
 
     @staticmethod
     def check(v: dict):
@@ -67,6 +71,8 @@ class WDAInvalidSessionIdError(WDARequestError):
         "error" : "invalid session id",
         "message" : "Session does not exist",
     """
+    ERROR_KEY = 'invalid session id'
+
     @staticmethod
     def check(v: dict):
         if v.get('error') == 'invalid session id':
@@ -84,6 +90,8 @@ class WDAPossiblyCrashedError(WDARequestError):
 
 class WDAUnknownError(WDARequestError):
     """ error: unknown error, message: *** - """
+    ERROR_KEY = 'unknown error'
+
     @staticmethod
     def check(v: dict):
         return v.get("error") == "unknown error"
@@ -91,6 +99,8 @@ class WDAUnknownError(WDARequestError):
 
 class WDAStaleElementReferenceError(WDARequestError):
     """ error: 'stale element reference' """
+    ERROR_KEY = 'stale element reference'
+
     @staticmethod
     def check(v: dict):
         return v.get("error") == 'stale element reference'
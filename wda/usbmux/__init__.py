@@ -5,12 +5,20 @@
 """
 
 import json
-from http.client import HTTPConnection, HTTPSConnection, HTTPResponse
+import select
+import typing
+from http.client import BadStatusLine, HTTPConnection, HTTPSConnection, HTTPResponse
 from urllib.parse import urlparse
 
 from wda.usbmux.exceptions import HTTPError, MuxConnectError, MuxError
 from wda.usbmux.pyusbmux import select_device
 
+try:
+    import orjson  # optional, parse bytes faster on big responses like source
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 _DEFAULT_CHUNK_SIZE = 4096
 
 def http_create(url: str) -> HTTPConnection:
@@ -33,7 +41,7 @@ class HTTPResponseWrapper:
         self.status_code = status_code
     
     def json(self):
-        return json.loads(self.content)
+        return _json_loads(self.content)
 
     @property
     def text(self) -> str:
@@ -51,24 +59,98 @@ def fetch(url: str, method="GET", data=None, timeout=None, chunk_size: int = _DE
         HTTPError
     """
     try:
-        method = method.upper()
         conn = http_create(url)
-        conn.timeout = timeout
-        u = urlparse(url)
-        urlpath = url[len(u.scheme) + len(u.netloc) + 3:]
-
-        if not data:
-            conn.request(method, urlpath)
-        else:
-            conn.request(method, urlpath, json.dumps(data), headers={"Content-Type": "application/json"})
-        response = conn.getresponse()
-        content = _read_response(response, chunk_size)
-        resp = HTTPResponseWrapper(content, response.status)
-        return resp
+        return _request(conn, url, method.upper(), data, timeout, chunk_size)
     except Exception as e:
         raise HTTPError(e)
 
 
+_RETRY_METHODS = ("GET", "DELETE")
+
+
+def _is_dropped(conn: HTTPConnection) -> bool:
+    """ idle keep-alive socket is readable only when server closed it """
+    if conn.sock is None:
+        return False
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class HTTPSession:
+    """
+    Keep connections alive and reuse them for requests to the same host
+
+    Not thread safe, requests to the same host should be serialized by the caller
+
+    Args:
+        keepalive: close connection after each request if set to False
+    """
+    def __init__(self, keepalive: bool = True):
+        self._keepalive = keepalive
+        self._conns: typing.Dict[str, HTTPConnection] = {}
+
+    def fetch(self, url: str, method="GET", data=None, timeout=None, chunk_size: int = _DEFAULT_CHUNK_SIZE) -> HTTPResponseWrapper:
+        """
+        Raises:
+            HTTPError
+        """
+        u = urlparse(url)
+        key = u.scheme + "://" + u.netloc
+        method = method.upper()
+        conn = self._conns.get(key)
+        if conn is not None and _is_dropped(conn):
+            self._discard(key)
+            conn = None
+        # server might still close the idle connection meanwhile, only resend requests safe to repeat
+        retries = 1 if conn is not None and method in _RETRY_METHODS else 0
+        while True:
+            try:
+                if conn is None:
+                    conn = self._conns[key] = http_create(url)
+                resp = _request(conn, url, method, data, timeout, chunk_size)
+                if not self._keepalive:
+                    conn.close()
+                return resp
+            except (ConnectionError, BadStatusLine) as e:
+                self._discard(key)
+                conn = None
+                if retries <= 0:
+                    raise HTTPError(e)
+                retries -= 1
+            except Exception as e:
+                self._discard(key)
+                raise HTTPError(e)
+
+    def _discard(self, key: str):
+        """ drop failed connection, next request creates a new one (usbmux device is selected again) """
+        conn = self._conns.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        for conn in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+
+def _request(conn: HTTPConnection, url: str, method: str, data=None, timeout=None, chunk_size: int = _DEFAULT_CHUNK_SIZE) -> HTTPResponseWrapper:
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    u = urlparse(url)
+    urlpath = url[len(u.scheme) + len(u.netloc) + 3:]
+
+    if not data:
+        conn.request(method, urlpath)
+    else:
+        conn.request(method, urlpath, json.dumps(data), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    content = _read_response(response, chunk_size)
+    return HTTPResponseWrapper(content, response.status)
+
+
 def _read_response(response:HTTPResponse, chunk_size: int = _DEFAULT_CHUNK_SIZE) -> bytearray:
     content = bytearray()
     while True:
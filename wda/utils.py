@@ -56,10 +56,15 @@ def limit_call_depth(n: int):
 
 
 class AttrDict(dict):
+    """
+    Only top level keys can be accessed as attributes,
+    nested values are kept as they are, so big responses (eg: source) are not walked
+    """
     def __getattr__(self, key):
-        if isinstance(key, str) and key in self:
+        try:
             return self[key]
-        raise AttributeError("Attribute key not found", key)
+        except KeyError:
+            raise AttributeError("Attribute key not found", key) from None
 
 
 def convert(dictionary):